@@ -2,8 +2,10 @@ import numpy as np
 from unimol_tools.data.conformer import (
     inner_coords,
     coords2unimol,
+    coords2unimol_batch,
     inner_smi2coords,
     create_mol_from_atoms_and_coords,
+    parallel_map,
 )
 from unimol_tools.data.dictionary import Dictionary
 
@@ -37,3 +39,43 @@ def test_create_mol_from_atoms_and_coords():
 
     assert isinstance(mol, Mol)
     assert mol.GetNumAtoms() == 2
+
+
+def test_parallel_map_keeps_order():
+    items = ['C' * i for i in range(1, 20)]
+    expected = [len(item) for item in items]
+    assert parallel_map(len, items, multi_process=False) == expected
+    assert parallel_map(len, items, multi_process=True, processes=2) == expected
+
+
+def test_coords2unimol_batch_matches_coords2unimol():
+    d = Dictionary()
+    for a in ['C', 'O', 'H']:
+        d.add_symbol(a)
+    # 'Xe' is not in the dictionary and maps to unk.
+    atoms_list = [['C', 'H', 'O', 'H'], ['O', 'Xe', 'C'], ['H', 'C']]
+    coords_list = [np.random.randn(len(atoms), 3) for atoms in atoms_list]
+    for remove_hs in [True, False]:
+        batch = coords2unimol_batch(atoms_list, coords_list, d, remove_hs=remove_hs)
+        for feat, atoms, coords in zip(batch, atoms_list, coords_list):
+            expected = coords2unimol(atoms, coords, d, remove_hs=remove_hs)
+            assert np.array_equal(feat['src_tokens'], expected['src_tokens'])
+            assert np.allclose(feat['src_coord'], expected['src_coord'], atol=1e-6)
+    assert batch[1]['src_tokens'][2] == d.unk()
+
+
+def test_dictionary_index_table_is_memoized():
+    d = Dictionary()
+    d.add_symbol('C')
+    table = d.index_table()
+    assert d.index_table() is table
+    d.add_symbol('O')
+    symbols, indices = d.index_table()
+    assert 'O' in symbols and indices[list(symbols).index('O')] == d.index('O')
+
+
+def test_coords2unimol_batch_crops_to_max_atoms():
+    d = Dictionary()
+    d.add_symbol('C')
+    feat = coords2unimol_batch([['C'] * 10], [np.random.randn(10, 3)], d, max_atoms=4)[0]
+    assert len(feat['src_tokens']) == 6 and feat['src_coord'].shape == (6, 3)
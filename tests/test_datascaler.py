@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 from sklearn.preprocessing import PowerTransformer
 
 from unimol_tools.data.datascaler import TargetScaler
@@ -20,3 +21,35 @@ def test_power_trans_scaler_choice():
     assert isinstance(pos_scaler, PowerTransformer)
     assert pos_scaler.method == 'box-cox'
     assert neg_scaler.method == 'yeo-johnson'
+
+
+def test_multilabel_affine_inverse_matches_sklearn(tmp_path):
+    y = np.random.rand(20, 3) * 10
+    y[0, 1] = np.nan
+    scaler = TargetScaler('standard', 'multilabel_regression')
+    scaler.fit(y, str(tmp_path))
+    scaled = scaler.transform(y)
+    assert scaler.inverse_affine_params() is not None
+    restored = scaler.inverse_transform(scaled)
+    expected = np.column_stack(
+        [s.inverse_transform(scaled[:, i : i + 1]).ravel() for i, s in enumerate(scaler.scaler)]
+    )
+    assert np.allclose(restored, expected, equal_nan=True)
+    assert np.allclose(restored, y, equal_nan=True)
+
+
+def test_affine_inverse_checks_target_columns(tmp_path):
+    y = np.random.rand(20, 3)
+    scaler = TargetScaler('standard', 'multilabel_regression')
+    scaler.fit(y, str(tmp_path))
+    with pytest.raises(AssertionError):
+        scaler.inverse_transform(y[:, :1])
+
+
+def test_non_affine_scaler_is_checked_once(tmp_path):
+    y = np.random.rand(20, 1) + 1.0
+    scaler = TargetScaler('minmax', 'regression')
+    scaler.fit(y, str(tmp_path))
+    assert scaler.inverse_affine_params() is None
+    assert scaler._inverse_affine is False
+    assert np.allclose(scaler.inverse_transform(scaler.transform(y)), y)
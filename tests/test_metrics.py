@@ -1,5 +1,6 @@
 import numpy as np
 import torch
+from sklearn.metrics import average_precision_score, matthews_corrcoef
 
 from unimol_tools.utils.metrics import (
     cal_nan_metric,
@@ -37,6 +38,30 @@ def test_metrics_classification_threshold():
     assert np.isclose(th, 0.3)
 
 
+def _reference_threshold(metric, target, pred, step):
+    best_metric, best_threshold = float('-inf'), 0.5
+    for threshold in np.linspace(pred.min(), pred.max(), step):
+        pred_label = np.zeros_like(pred)
+        pred_label[pred > threshold] = 1
+        if metric(target, pred_label) > best_metric:
+            best_metric, best_threshold = metric(target, pred_label), threshold
+    return best_threshold
+
+
+def test_metrics_threshold_search_matches_loop():
+    rng = np.random.RandomState(0)
+    target = rng.randint(0, 2, size=(50, 1))
+    pred = np.clip(target * 0.3 + rng.rand(50, 1) * 0.7, 0.0, 1.0)
+    # default multilabel metrics have no 'int' metric; thresholds are scored with the last one (auprc).
+    metric = Metrics('multilabel_classification')
+    th = metric.calculate_single_classification_threshold(target, pred, step=20)
+    assert np.isclose(th, _reference_threshold(average_precision_score, target, pred, 20))
+
+    metric = Metrics('classification', metrics_str='mcc')
+    th = metric.calculate_single_classification_threshold(target, pred, step=20)
+    assert np.isclose(th, _reference_threshold(matthews_corrcoef, target, pred, 20))
+
+
 def test_metrics_calculation():
     cls = Metrics('classification', metrics_str='acc')
     out = cls.cal_metric(np.array([[1], [0]]), np.array([[0.6], [0.3]]))
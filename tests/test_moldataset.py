@@ -0,0 +1,116 @@
+import numpy as np
+import torch
+from unimol_tools.data.conformer import coords2unimol
+from unimol_tools.data.dictionary import Dictionary
+from unimol_tools.models.unimol import UniMolModel
+from unimol_tools.predictor import MolDataset
+
+
+def _dictionary():
+    d = Dictionary()
+    for a in ['C', 'O', 'H']:
+        d.add_symbol(a)
+    return d
+
+
+def _unimol_inputs(atoms_list=(['C', 'O'], ['C', 'C', 'O', 'H'])):
+    d = _dictionary()
+    coords_list = [np.random.randn(len(atoms), 3) for atoms in atoms_list]
+    return [
+        coords2unimol(atoms, coords, d, remove_hs=False)
+        for atoms, coords in zip(atoms_list, coords_list)
+    ]
+
+
+class _CollateStub:
+    """Carries the attributes the UniMolModel collate functions need, without loading weights."""
+
+    batch_collate_fn = UniMolModel.batch_collate_fn
+    batch_collate_soa_fn = UniMolModel.batch_collate_soa_fn
+
+    def __init__(self, pad_to_multiple=1):
+        self.dictionary = _dictionary()
+        self.padding_idx = self.dictionary.pad()
+        self.pad_to_multiple = pad_to_multiple
+
+
+def test_moldataset_soa_slabs():
+    inputs = _unimol_inputs()
+    dataset = MolDataset(inputs)
+    assert dataset.soa and len(dataset) == 2
+    assert dataset.atoms_np.shape == (2, 6)
+    assert dataset.coords_np.shape == (2, 6, 3)
+    feat, label = dataset[0]
+    assert feat['src_mask'].sum() == len(inputs[0]['src_tokens'])
+    assert np.array_equal(feat['src_tokens'][:4], inputs[0]['src_tokens'])
+    assert np.allclose(feat['src_coord'][:4], inputs[0]['src_coord'])
+    assert label.shape == (1,)
+
+
+def test_moldataset_keeps_other_inputs():
+    inputs = [{'src_tokens': [6, 8], 'atom_mask': np.ones(2)}]
+    dataset = MolDataset(inputs)
+    assert not dataset.soa
+    assert dataset[0][0] is inputs[0]
+
+
+def test_moldataset_soa_from_tokens_and_coords():
+    inputs = [
+        {'src_tokens': np.array([1, 4, 5, 2]), 'src_coord': np.zeros((4, 3))},
+        {'src_tokens': np.array([1, 4, 2]), 'src_coord': np.zeros((3, 3))},
+    ]
+    dataset = MolDataset(inputs)
+    assert dataset.soa
+    assert dataset.mask_np.sum() == 7
+
+
+def test_moldataset_unlabeled_shares_zero_label():
+    dataset = MolDataset(_unimol_inputs())
+    assert dataset.label is None
+    assert dataset[0][1] is dataset[1][1]
+    assert not dataset[0][1].any()
+    assert not dataset[0][1].flags.writeable
+
+
+def test_soa_collate_matches_raw_collate():
+    inputs = _unimol_inputs()
+    stub = _CollateStub()
+    label = np.zeros(1, dtype=np.float32)
+    raw, _ = stub.batch_collate_fn([(item, label) for item in inputs])
+    dataset = MolDataset(inputs)
+    soa, soa_label = stub.batch_collate_fn([dataset[i] for i in range(len(dataset))])
+    assert soa_label.shape == (2, 1)
+    mask = raw['src_tokens'] != stub.padding_idx
+    pair_mask = mask.unsqueeze(-1) & mask.unsqueeze(-2)
+    assert soa['src_tokens'].shape == raw['src_tokens'].shape
+    assert torch.equal(soa['src_tokens'], raw['src_tokens'])
+    assert torch.equal(soa['src_edge_type'][pair_mask], raw['src_edge_type'][pair_mask])
+    assert torch.allclose(soa['src_distance'][pair_mask], raw['src_distance'][pair_mask], atol=1e-5)
+    assert torch.allclose(soa['src_coord'][mask], raw['src_coord'][mask], atol=1e-6)
+    # padding positions carry the same fill values as the padding utilities.
+    assert (soa['src_edge_type'][~pair_mask] == stub.padding_idx).all()
+    assert (soa['src_distance'][~pair_mask] == 0).all()
+    assert (soa['src_coord'][~mask] == 0).all()
+
+
+def test_soa_collate_rounds_batch_width_to_multiple():
+    # slab width is 14 tokens, set by the third molecule.
+    dataset = MolDataset(_unimol_inputs((['C', 'O'], ['C', 'C', 'O', 'H'], ['C'] * 12)))
+    exact, _ = _CollateStub().batch_collate_fn([dataset[0], dataset[1]])
+    padded, _ = _CollateStub(pad_to_multiple=8).batch_collate_fn([dataset[0], dataset[1]])
+    assert exact['src_tokens'].shape[1] == 6
+    assert padded['src_tokens'].shape[1] == 8
+    # extra columns are padding, so the real positions are unchanged.
+    padding_idx = _CollateStub().padding_idx
+    assert (padded['src_tokens'][:, 6:] == padding_idx).all()
+    assert (padded['src_coord'][:, 6:] == 0).all()
+    assert (padded['src_distance'][:, 6:] == 0).all() and (padded['src_distance'][:, :, 6:] == 0).all()
+    assert (padded['src_edge_type'][:, 6:] == padding_idx).all()
+    assert (padded['src_edge_type'][:, :, 6:] == padding_idx).all()
+    assert torch.equal(padded['src_tokens'][:, :6], exact['src_tokens'])
+    assert torch.equal(padded['src_coord'][:, :6], exact['src_coord'])
+    assert torch.equal(padded['src_edge_type'][:, :6, :6], exact['src_edge_type'])
+    assert torch.allclose(padded['src_distance'][:, :6, :6], exact['src_distance'])
+    # the rounded width is capped at the slab width.
+    capped, _ = _CollateStub(pad_to_multiple=8).batch_collate_fn([dataset[i] for i in range(3)])
+    assert capped['src_tokens'].shape[1] == 14
@@ -91,3 +91,14 @@ def test_unimol_repr_tox21_sdf(tmp_path):
     except Exception as e:
         pytest.skip(f'representation failed: {e}')
     assert isinstance(out, dict) and len(out['cls_repr']) == len(data)
+
+
+@pytest.mark.network
+def test_unimol_repr_tensor_not_inference_tensor():
+    repr_model = UniMolRepr(batch_size=2)
+    try:
+        tensor = repr_model.get_repr(['CCO', 'c1ccccc1', 'CC(=O)O'], return_tensor=True)
+    except Exception as e:
+        pytest.skip(f'representation failed: {e}')
+    assert tensor.shape[0] == 3
+    assert not tensor.is_inference()
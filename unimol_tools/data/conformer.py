@@ -166,14 +166,7 @@ class ConformerGen(object):
 
     def transform(self, smiles_list):
         logger.info('Start generating conformers...')
-        if self.multi_process:
-            pool = Pool(processes=min(8, os.cpu_count()))
-            results = [
-                item for item in tqdm(pool.imap(self.single_process, smiles_list))
-            ]
-            pool.close()
-        else:
-            results = [self.single_process(smiles) for smiles in tqdm(smiles_list)]
+        results = parallel_map(self.single_process, smiles_list, self.multi_process)
 
         inputs, mols = zip(*results)
         inputs = list(inputs)
@@ -217,6 +210,28 @@ class ConformerGen(object):
         return inputs, mols
 
 
+def parallel_map(func, items, multi_process=True, processes=None):
+    """
+    Applies `func` to every item, optionally with a process pool. Items are sent to the workers in chunks
+    to amortize the inter-process communication, and results keep the input order.
+
+    :param func: (callable) The picklable function applied to each item.
+    :param items: (list) The items to process.
+    :param multi_process: (bool, optional) Whether to use a process pool. Defaults to True.
+    :param processes: (int, optional) Number of worker processes. Defaults to min(8, os.cpu_count()).
+
+    :return: A list of results in the same order as `items`.
+    """
+    processes = processes or min(8, os.cpu_count())
+    if not multi_process or processes <= 1:
+        return [func(item) for item in tqdm(items)]
+    chunksize = max(1, len(items) // (processes * 4))
+    with Pool(processes=processes) as pool:
+        return list(
+            tqdm(pool.imap(func, items, chunksize=chunksize), total=len(items))
+        )
+
+
 def inner_smi2coords(smi, seed=42, mode='fast', remove_hs=True, return_mol=False):
     '''
     This function is responsible for converting a SMILES (Simplified Molecular Input Line Entry System) string into 3D coordinates for each atom in the molecule. It also allows for the generation of 2D coordinates if 3D conformation generation fails, and optionally removes hydrogen atoms and their coordinates from the resulting data.
@@ -357,6 +372,51 @@ def coords2unimol(
     }
 
 
+def coords2unimol_batch(
+    atoms_list, coordinates_list, dictionary, max_atoms=256, remove_hs=True, **params
+):
+    """
+    Converts a batch of atom symbols and coordinates into the tokens and coordinates of `coords2unimol`.
+    All atoms are tokenized in one vectorized lookup; distances and edge types are left to the collate function.
+
+    :param atoms_list: (list) List of atom symbol lists, one per molecule.
+    :param coordinates_list: (list) List of atomic coordinate arrays, one per molecule.
+    :param dictionary: (Dictionary) An object that maps atom symbols to unique integers.
+    :param max_atoms: (int) The maximum number of atoms to consider for each molecule.
+    :param remove_hs: (bool) Whether to remove hydrogen atoms from the representation.
+    :param params: Additional parameters.
+
+    :return: A list of dictionaries with tokens and coordinates.
+    """
+    assert len(atoms_list) == len(coordinates_list), "coordinates shape is not align atoms"
+    symbols, indices = dictionary.index_table()
+    lengths = [len(atoms) for atoms in atoms_list]
+    flat_atoms = np.concatenate([np.asarray(atoms, dtype=str) for atoms in atoms_list])
+    # unknown symbols map to unk as in `Dictionary.index`.
+    pos = np.searchsorted(symbols, flat_atoms).clip(max=len(symbols) - 1)
+    flat_tokens = np.where(
+        symbols[pos] == flat_atoms, indices[pos], dictionary.unk()
+    )
+    bounds = np.cumsum([0] + lengths)
+    inputs = []
+    for i, coordinates in enumerate(coordinates_list):
+        assert lengths[i] == len(coordinates), "coordinates shape is not align atoms"
+        tokens = flat_tokens[bounds[i] : bounds[i + 1]]
+        coordinates = np.array(coordinates).astype(np.float32)
+        if remove_hs:
+            keep = flat_atoms[bounds[i] : bounds[i + 1]] != 'H'
+            tokens, coordinates = tokens[keep], coordinates[keep]
+        # cropping atoms and coordinates
+        if len(tokens) > max_atoms:
+            idx = np.random.choice(len(tokens), max_atoms, replace=False)
+            tokens, coordinates = tokens[idx], coordinates[idx]
+        src_tokens = np.concatenate([[dictionary.bos()], tokens, [dictionary.eos()]])
+        src_coord = np.zeros((len(src_tokens), 3), dtype=np.float32)
+        src_coord[1:-1] = coordinates - coordinates.mean(axis=0)
+        inputs.append({'src_tokens': src_tokens.astype(int), 'src_coord': src_coord})
+    return inputs
+
+
 class UniMolV2Feature(object):
     '''
     This class is responsible for generating features for molecules represented as SMILES strings. It uses the ConformerGen class to generate conformers for the molecules and converts the resulting atom symbols and coordinates into a unified molecular representation.
@@ -428,22 +488,22 @@ class UniMolV2Feature(object):
             inputs.append(mol2unimolv2(mol, self.max_atoms, remove_hs=self.remove_hs))
         return inputs
 
+    def single_process_mol(self, mol):
+        """
+        Converts a single molecule with conformer into the unimolv2 representation.
+
+        :param mol: (rdkit.Chem.Mol) The molecule object containing atom symbols and coordinates.
+        :return: A unimolecular data representation (dictionary) of the molecule.
+        """
+        return mol2unimolv2(mol, self.max_atoms, remove_hs=self.remove_hs)
+
     def transform_mols(self, mols_list):
-        inputs = []
-        for mol in mols_list:
-            inputs.append(mol2unimolv2(mol, self.max_atoms, remove_hs=self.remove_hs))
-        return inputs
+        # graph features are computed per molecule, so spread them over processes like conformers.
+        return parallel_map(self.single_process_mol, mols_list, self.multi_process)
 
     def transform(self, smiles_list):
         logger.info('Start generating conformers...')
-        if self.multi_process:
-            pool = Pool(processes=min(8, os.cpu_count()))
-            results = [
-                item for item in tqdm(pool.imap(self.single_process, smiles_list))
-            ]
-            pool.close()
-        else:
-            results = [self.single_process(smiles) for smiles in tqdm(smiles_list)]
+        results = parallel_map(self.single_process, smiles_list, self.multi_process)
 
         inputs, mols = zip(*results)
         inputs = list(inputs)
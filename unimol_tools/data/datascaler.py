@@ -42,6 +42,7 @@ class TargetScaler(object):
             self.scaler = joblib.load(os.path.join(load_dir, 'target_scaler.ss'))
         else:
             self.scaler = None
+        self._inverse_affine = None
 
     def transform(self, target):
         """
@@ -84,7 +85,8 @@ class TargetScaler(object):
             return
         elif self.ss_method == 'none':
             return
-        elif self.ss_method == 'auto':
+        self._inverse_affine = None
+        if self.ss_method == 'auto':
             if self.task == 'regression':
                 if self.is_skewed(target):
                     self.scaler = FunctionTransformer(
@@ -187,6 +189,14 @@ class TargetScaler(object):
             return target
         if self.ss_method == 'none' or self.scaler is None:
             return target
+        affine = self.inverse_affine_params()
+        if affine is not None:
+            # x * scale + offset for all targets at once, without the sklearn per-call overhead.
+            scale, offset = affine
+            target = np.asarray(target)
+            assert target.shape[-1] == scale.shape[0], "target columns do not match the fitted scalers"
+            dtype = target.dtype if np.issubdtype(target.dtype, np.floating) else np.float64
+            return (target * scale + offset).astype(dtype, copy=False)
         elif self.task == 'regression':
             return self.scaler.inverse_transform(target)
         elif self.task == 'multilabel_regression':
@@ -204,6 +214,38 @@ class TargetScaler(object):
         else:
             raise ValueError('Unknown scaler method: {}'.format(self.ss_method))
 
+    def inverse_affine_params(self):
+        """
+        Collects the inverse transform of linear scalers as one row of scales and offsets, so that
+        `inverse_transform` reduces to `target * scale + offset`. The result is cached until the next `fit`.
+
+        :return: (tuple or None) The (scale, offset) arrays with one entry per target column,
+                 or None if any scaler is not a StandardScaler, RobustScaler or MaxAbsScaler.
+        """
+        if self._inverse_affine is not None:
+            # False marks scalers already found not to be linear.
+            return self._inverse_affine or None
+        scalers = self.scaler if isinstance(self.scaler, list) else [self.scaler]
+        scales, offsets = [], []
+        for scaler in scalers:
+            n_features = getattr(scaler, 'n_features_in_', None)
+            if isinstance(scaler, StandardScaler):
+                scale, offset = scaler.scale_, scaler.mean_
+            elif isinstance(scaler, RobustScaler):
+                scale, offset = scaler.scale_, scaler.center_
+            elif isinstance(scaler, MaxAbsScaler):
+                scale, offset = scaler.scale_, None
+            else:
+                self._inverse_affine = False
+                return None
+            scales.append(np.ones(n_features) if scale is None else scale)
+            offsets.append(np.zeros(n_features) if offset is None else offset)
+        self._inverse_affine = (
+            np.concatenate(scales).astype(np.float64),
+            np.concatenate(offsets).astype(np.float64),
+        )
+        return self._inverse_affine
+
     def is_skewed(self, target):
         """
         Determines whether the target values are skewed based on skewness and kurtosis metrics.
@@ -27,6 +27,7 @@ class Dictionary:
         self.count = []
         self.indices = {}
         self.specials = set()
+        self._index_table = None
 
         # initialize dictionary with special tokens
         for token in [bos, unk, pad, eos]:
@@ -61,6 +62,13 @@ class Dictionary:
             return self.indices[sym]
         return self.indices[self.unk_word]
 
+    def index_table(self):
+        """Returns the sorted symbols and their indices for vectorized lookup, built once until a symbol is added"""
+        if self._index_table is None:
+            symbols = np.sort(np.array(self.symbols))
+            self._index_table = (symbols, np.array([self.index(sym) for sym in symbols]))
+        return self._index_table
+
     def special_index(self):
         return [self.index(x) for x in self.specials]
 
@@ -68,6 +76,7 @@ class Dictionary:
         """Adds a word to the dictionary"""
         if is_special:
             self.specials.add(word)
+        self._index_table = None
         if word in self.indices and not overwrite:
             idx = self.indices[word]
             self.count[idx] = self.count[idx] + n
@@ -68,6 +68,8 @@ class UniMolModel(nn.Module):
         self.output_dim = output_dim
         self.data_type = data_type
         self.remove_hs = params.get('remove_hs', False)
+        # round padded batch lengths up to a multiple, so fewer distinct shapes are seen.
+        self.pad_to_multiple = params.get('pad_to_multiple', 1)
         if data_type == 'molecule':
             name = "no_h" if self.remove_hs else "all_h"
             name = data_type + '_' + name
@@ -265,29 +267,74 @@ class UniMolModel(nn.Module):
 
         :return: A tuple containing a batch dictionary and labels.
         """
+        if 'src_mask' in samples[0][0]:
+            return self.batch_collate_soa_fn(samples)
         batch = {}
         for k in samples[0][0].keys():
             if k == 'src_coord':
                 v = pad_coords(
-                    [torch.tensor(s[0][k]).float() for s in samples], pad_idx=0.0
+                    [torch.as_tensor(s[0][k]).float() for s in samples], pad_idx=0.0
                 )
             elif k == 'src_edge_type':
                 v = pad_2d(
-                    [torch.tensor(s[0][k]).long() for s in samples],
+                    [torch.as_tensor(s[0][k]).long() for s in samples],
                     pad_idx=self.padding_idx,
                 )
             elif k == 'src_distance':
                 v = pad_2d(
-                    [torch.tensor(s[0][k]).float() for s in samples], pad_idx=0.0
+                    [torch.as_tensor(s[0][k]).float() for s in samples], pad_idx=0.0
                 )
             elif k == 'src_tokens':
                 v = pad_1d_tokens(
-                    [torch.tensor(s[0][k]).long() for s in samples],
+                    [torch.as_tensor(s[0][k]).long() for s in samples],
                     pad_idx=self.padding_idx,
                 )
             batch[k] = v
         try:
-            label = torch.tensor(np.array([s[1] for s in samples]))
+            label = torch.from_numpy(np.array([s[1] for s in samples]))
+        except:
+            label = None
+        return batch, label
+
+    def batch_collate_soa_fn(self, samples):
+        """
+        Vectorized collate function for samples sliced from padded structure-of-arrays slabs,
+        e.g. `MolDataset`. Each sample provides `src_tokens`, `src_coord` and `src_mask` padded to
+        the same length; distances and edge types are derived for the whole batch at once.
+        The batch length is rounded up to a multiple of `pad_to_multiple` when it is set.
+
+        :param samples: A list of sample data.
+
+        :return: A tuple containing a batch dictionary and labels.
+        """
+        mask = np.stack([s[0]['src_mask'] for s in samples])
+        size = int(mask.sum(axis=1).max())
+        if self.pad_to_multiple > 1:
+            # bucket lengths to bound cuda graph re-records under reduce-overhead compile.
+            size = -(-size // self.pad_to_multiple) * self.pad_to_multiple
+            size = min(size, mask.shape[1])
+        mask = torch.from_numpy(mask[:, :size]).bool()
+        tokens = torch.from_numpy(
+            np.stack([s[0]['src_tokens'][:size] for s in samples])
+        ).long()
+        coord = torch.from_numpy(np.stack([s[0]['src_coord'][:size] for s in samples]))
+        pair_mask = mask.unsqueeze(-1) & mask.unsqueeze(-2)
+        tokens = tokens.masked_fill(~mask, self.padding_idx)
+        coord = coord.masked_fill(~mask.unsqueeze(-1), 0.0)
+        distance = torch.cdist(
+            coord, coord, compute_mode='donot_use_mm_for_euclid_dist'
+        ).masked_fill(~pair_mask, 0.0)
+        edge_type = (
+            tokens.unsqueeze(-1) * len(self.dictionary) + tokens.unsqueeze(-2)
+        ).masked_fill(~pair_mask, self.padding_idx)
+        batch = {
+            'src_tokens': tokens,
+            'src_distance': distance,
+            'src_coord': coord,
+            'src_edge_type': edge_type,
+        }
+        try:
+            label = torch.from_numpy(np.array([s[1] for s in samples]))
         except:
             label = None
         return batch, label
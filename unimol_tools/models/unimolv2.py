@@ -348,49 +348,49 @@ class UniMolV2Model(nn.Module):
         for k in samples[0][0].keys():
             if k == 'atom_feat':
                 v = pad_coords(
-                    [torch.tensor(s[0][k]) for s in samples],
+                    [torch.as_tensor(s[0][k]) for s in samples],
                     pad_idx=self.padding_idx,
                     dim=8,
                 )
             elif k == 'atom_mask':
                 v = pad_1d_tokens(
-                    [torch.tensor(s[0][k]) for s in samples], pad_idx=self.padding_idx
+                    [torch.as_tensor(s[0][k]) for s in samples], pad_idx=self.padding_idx
                 )
             elif k == 'edge_feat':
                 v = pad_2d(
-                    [torch.tensor(s[0][k]) for s in samples],
+                    [torch.as_tensor(s[0][k]) for s in samples],
                     pad_idx=self.padding_idx,
                     dim=3,
                 )
             elif k == 'shortest_path':
                 v = pad_2d(
-                    [torch.tensor(s[0][k]) for s in samples], pad_idx=self.padding_idx
+                    [torch.as_tensor(s[0][k]) for s in samples], pad_idx=self.padding_idx
                 )
             elif k == 'degree':
                 v = pad_1d_tokens(
-                    [torch.tensor(s[0][k]) for s in samples], pad_idx=self.padding_idx
+                    [torch.as_tensor(s[0][k]) for s in samples], pad_idx=self.padding_idx
                 )
             elif k == 'pair_type':
                 v = pad_2d(
-                    [torch.tensor(s[0][k]) for s in samples],
+                    [torch.as_tensor(s[0][k]) for s in samples],
                     pad_idx=self.padding_idx,
                     dim=2,
                 )
             elif k == 'attn_bias':
                 v = pad_2d(
-                    [torch.tensor(s[0][k]) for s in samples], pad_idx=self.padding_idx
+                    [torch.as_tensor(s[0][k]) for s in samples], pad_idx=self.padding_idx
                 )
             elif k == 'src_tokens':
                 v = pad_1d_tokens(
-                    [torch.tensor(s[0][k]) for s in samples], pad_idx=self.padding_idx
+                    [torch.as_tensor(s[0][k]) for s in samples], pad_idx=self.padding_idx
                 )
             elif k == 'src_coord':
                 v = pad_coords(
-                    [torch.tensor(s[0][k]) for s in samples], pad_idx=self.padding_idx
+                    [torch.as_tensor(s[0][k]) for s in samples], pad_idx=self.padding_idx
                 )
             batch[k] = v
         try:
-            label = torch.tensor(np.array([s[1] for s in samples]))
+            label = torch.from_numpy(np.array([s[1] for s in samples]))
         except:
             label = None
         return batch, label
@@ -10,24 +10,68 @@ import torch
 from torch.utils.data import Dataset
 
 from .data import DataHub
+from .data.conformer import coords2unimol_batch
 from .models import UniMolModel, UniMolV2Model
 from .tasks import Trainer
 
+# keys of a unimol v1 input; only tokens and coordinates are kept in the slabs.
+UNIMOL_V1_KEYS = {'src_tokens', 'src_distance', 'src_coord', 'src_edge_type'}
+# placeholder label shared by all items of an unlabeled dataset.
+ZERO_LABEL = np.zeros(1, dtype=np.float32)
+ZERO_LABEL.setflags(write=False)
+
 
 class MolDataset(Dataset):
     """
     A :class:`MolDataset` class is responsible for interface of molecular dataset.
+
+    Uni-Mol v1 inputs are stored as padded structure-of-arrays slabs of tokens, coordinates and
+    atom masks, so that items are cheap slices and the batch is assembled in one vectorized pass
+    by the model's collate function. Distances and edge types are derived from the slabs at collate time.
+    Items are views of the slabs; collate stacks them into a fresh array and wraps it with
+    `torch.from_numpy` without a further copy, so batch tensors never alias the slabs.
+    Other inputs (e.g. Uni-Mol v2 features) are kept as a list of dicts.
     """
 
     def __init__(self, data, label=None):
-        self.data = data
-        self.label = label if label is not None else np.zeros((len(data), 1))
+        # unlabeled datasets (e.g. repr) return a shared zero label instead of allocating one per item.
+        self.label = label
+        self.soa = len(data) > 0 and set(data[0]) <= UNIMOL_V1_KEYS
+        if self.soa:
+            self._init_soa(data)
+        else:
+            self.data = data
+
+    def _init_soa(self, data):
+        """
+        Packs the per-molecule unimol inputs into padded numpy arrays.
+
+        :param data: list of dict, unimol inputs with `src_tokens` and `src_coord`.
+        """
+        lengths = np.array([len(item['src_tokens']) for item in data])
+        max_atoms = lengths.max()
+        self.atoms_np = np.zeros((len(data), max_atoms), dtype=np.int16)
+        self.coords_np = np.zeros((len(data), max_atoms, 3), dtype=np.float32)
+        self.mask_np = np.zeros((len(data), max_atoms), dtype=np.uint8)
+        for i, item in enumerate(data):
+            self.atoms_np[i, : lengths[i]] = item['src_tokens']
+            self.coords_np[i, : lengths[i]] = item['src_coord']
+        self.mask_np[np.arange(max_atoms) < lengths[:, None]] = 1
 
     def __getitem__(self, idx):
-        return self.data[idx], self.label[idx]
+        if self.soa:
+            return {
+                'src_tokens': self.atoms_np[idx],
+                'src_coord': self.coords_np[idx],
+                'src_mask': self.mask_np[idx],
+            }, self._get_label(idx)
+        return self.data[idx], self._get_label(idx)
+
+    def _get_label(self, idx):
+        return ZERO_LABEL if self.label is None else self.label[idx]
 
     def __len__(self):
-        return len(self.data)
+        return len(self.atoms_np) if self.soa else len(self.data)
 
 
 class UniMolRepr(object):
@@ -47,6 +91,11 @@ class UniMolRepr(object):
         use_ddp=False,
         use_gpu='all',
         save_path=None,
+        num_workers=0,
+        prefetch_factor=4,
+        persistent_workers=True,
+        pin_memory=True,
+        precision='bf16',
         **kwargs,
     ):
         """
@@ -61,13 +110,35 @@ class UniMolRepr(object):
         :param use_cuda: bool, default=True, whether to use gpu.
         :param use_ddp: bool, default=False, whether to use distributed data parallel.
         :param use_gpu: str, default='all', which gpu to use.
+        :param num_workers: int, default=0, number of dataloader workers to prepare batches in parallel. 0 means loading in the main process.
+        :param prefetch_factor: int, default=4, number of batches loaded in advance by each worker. Only works when num_workers > 0.
+        :param persistent_workers: bool, default=True, whether to keep dataloader workers alive. Only works when num_workers > 0.
+        :param pin_memory: bool, default=True, whether to use pinned memory so host to device transfers overlap with compute.
+        :param precision: str, default='bf16', precision of inference on gpu. currently support: bf16, fp16, fp32. \
+            bf16 falls back to fp16 on gpus without bf16 support. fp32 disables autocast.
+        :param kwargs: other parameters.
+
+            - compile_mode: str, default='reduce-overhead', mode of `torch.compile` applied to the model when running on gpu. \
+                currently support: default, reduce-overhead, max-autotune. None means no compilation. \
+                The first call of `get_repr` pays the compilation cost.
+            - pad_to_multiple: int, round the padded atom count of each unimolv1 batch up to this multiple, \
+                so the cuda graphs recorded by reduce-overhead compile are replayed instead of re-recorded. 1 disables bucketing. \
+                Defaults to 8 when the model is compiled on gpu, otherwise 1.
+            - max_atoms: int, maximum number of atoms kept per molecule; larger molecules are randomly cropped. \
+                Defaults to 256 for unimolv1 and 128 for unimolv2.
         """
         self.device = torch.device(
             "cuda:0" if torch.cuda.is_available() and use_cuda else "cpu"
         )
+        self.compile_mode = kwargs.get('compile_mode', 'reduce-overhead')
+        # bucketing only pays off when there are cuda graphs to replay.
+        compiled = bool(self.compile_mode) and self.device.type == 'cuda'
         if model_name == 'unimolv1':
             self.model = UniMolModel(
-                output_dim=1, data_type=data_type, remove_hs=remove_hs
+                output_dim=1,
+                data_type=data_type,
+                remove_hs=remove_hs,
+                pad_to_multiple=kwargs.get('pad_to_multiple', 8 if compiled else 1),
             ).to(self.device)
         elif model_name == 'unimolv2':
             self.model = UniMolV2Model(output_dim=1, model_size=model_size).to(
@@ -76,6 +147,21 @@ class UniMolRepr(object):
         else:
             raise ValueError('Unknown model name: {}'.format(model_name))
         self.model.eval()
+        if precision not in ['bf16', 'fp16', 'fp32']:
+            raise ValueError('Unknown precision: {}'.format(precision))
+        self.precision = precision
+        if self.device.type == 'cuda' and precision != 'fp32':
+            if precision == 'bf16' and torch.cuda.is_bf16_supported():
+                self.autocast_dtype = torch.bfloat16
+            else:
+                self.autocast_dtype = torch.float16
+        else:
+            self.autocast_dtype = None
+        if compiled:
+            # dynamic shapes avoid recompiling for every padded atom count.
+            self.model = torch.compile(
+                self.model, mode=self.compile_mode, dynamic=True, fullgraph=False
+            )
         self.params = {
             'data_type': data_type,
             'batch_size': batch_size,
@@ -87,7 +173,16 @@ class UniMolRepr(object):
             'use_ddp': use_ddp,
             'use_gpu': use_gpu,
             'save_path': save_path,
+            'num_workers': num_workers,
+            'prefetch_factor': prefetch_factor,
+            'persistent_workers': persistent_workers,
+            'pin_memory': pin_memory,
+            # applied per batch by the trainer, so spawned ddp workers also run under autocast.
+            'autocast_dtype': self.autocast_dtype,
         }
+        if 'max_atoms' in kwargs:
+            self.params['max_atoms'] = kwargs['max_atoms']
+        self.trainer = Trainer(task='repr', **self.params)
 
     def get_repr(self, data=None, return_atomic_reprs=False, return_tensor=False):
         """
@@ -132,6 +227,8 @@ class UniMolRepr(object):
                 assert isinstance(data[self.params['smiles_col']][-1], str)
         elif isinstance(data, list) or isinstance(data, np.ndarray) or isinstance(data, pd.Series):
             # list of smiles strings.
+            # passed to DataHub as is, which builds its DataFrame straight from the sequence;
+            # converting to a numpy array here would only add another O(N) copy.
             assert isinstance(data[0], str)
         elif isinstance(data, pd.DataFrame):
             # pandas DataFrame of smiles strings.
@@ -142,14 +239,20 @@ class UniMolRepr(object):
         else:
             raise ValueError('Unknown data type: {}'.format(type(data)))
 
-        datahub = DataHub(
-            data=data,
-            task='repr',
-            is_train=False,
-            **self.params,
-        )
-        dataset = MolDataset(datahub.data['unimol_input'])
-        self.trainer = Trainer(task='repr', **self.params)
+        # reseed per call, so molecules cropped to max_atoms get the same atoms on every call.
+        self.trainer.set_seed(self.trainer.seed)
+        if self._use_fast_dict_path(data):
+            # pre-conformerized inputs only need tokenization and coordinate centering.
+            dataset = MolDataset(self._fast_dict_to_unimol_input(data))
+        else:
+            datahub = DataHub(
+                data=data,
+                task='repr',
+                is_train=False,
+                **self.params,
+            )
+            dataset = MolDataset(datahub.data['unimol_input'])
+        # inference_mode and autocast are entered per batch by the trainer, so returned tensors stay usable by autograd.
         repr_output = self.trainer.inference(
             self.model,
             model_name=self.params['model_name'],
@@ -159,3 +262,40 @@ class UniMolRepr(object):
             return_tensor=return_tensor,
         )
         return repr_output
+
+    def _use_fast_dict_path(self, data):
+        """
+        Whether `data` is a dict of atom symbols and coordinates that can skip DataHub.
+        Only Uni-Mol v1 qualifies, since Uni-Mol v2 needs graph features built by rdkit.
+
+        :param data: input data of `get_repr`.
+        """
+        if self.params['model_name'] != 'unimolv1' or not isinstance(data, dict):
+            return False
+        if self.params['smiles_col'] in data or 'atoms' not in data or 'coordinates' not in data:
+            return False
+        atoms = data['atoms']
+        mol_atoms = atoms if len(atoms) and isinstance(atoms[0], str) else atoms[0]
+        # atomic numbers are converted to symbols by DataHub.
+        return len(mol_atoms) > 0 and isinstance(mol_atoms[0], str)
+
+    def _fast_dict_to_unimol_input(self, data):
+        """
+        Converts a dict of atoms and coordinates into unimol v1 inputs without DataHub.
+
+        :param data: dict, custom conformers with `atoms` and `coordinates`.
+
+        :return: A list of dicts with `src_tokens` and `src_coord`.
+        """
+        atoms_list, coordinates_list = data['atoms'], data['coordinates']
+        if isinstance(atoms_list[0], str):
+            # single molecule.
+            atoms_list, coordinates_list = [atoms_list], [coordinates_list]
+        return coords2unimol_batch(
+            atoms_list,
+            coordinates_list,
+            self.model.dictionary,
+            # same default as `ConformerGen`, which builds the inputs on the DataHub path.
+            max_atoms=self.params.get('max_atoms', 256),
+            remove_hs=self.params['remove_hs'],
+        )
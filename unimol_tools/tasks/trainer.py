@@ -6,6 +6,7 @@ from __future__ import absolute_import, division, print_function
 
 import os
 import time
+from contextlib import contextmanager
 from functools import partial
 
 import numpy as np
@@ -60,6 +61,14 @@ class Trainer(object):
         self.warmup_ratio = params.get('warmup_ratio', 0.1)
         self.patience = params.get('patience', 10)
         self.max_norm = params.get('max_norm', 1.0)
+        self.torch_compile = params.get('torch_compile', False)
+        ### init dataloader params ###
+        self.num_workers = params.get('num_workers', 0)
+        self.prefetch_factor = params.get('prefetch_factor', 4)
+        self.persistent_workers = params.get('persistent_workers', True)
+        self.pin_memory = params.get('pin_memory', True)
+        ### init inference params ###
+        self.autocast_dtype = params.get('autocast_dtype', None)
         self._init_dist(params)
 
     def _init_dist(self, params):
@@ -109,6 +118,44 @@ class Trainer(object):
         dist.init_process_group(backend='nccl', init_method='env://')
         self.device = torch.device("cuda", local_rank)
 
+    def compile_model(self, model):
+        """
+        Compiles the model in place with `torch.compile` if `torch_compile` is enabled, so that both the forward
+        and backward passes run as fused Inductor kernels. Compiling in place keeps the `state_dict` keys unchanged.
+
+        :param model: The model to be compiled.
+
+        :return: The (compiled) model.
+        """
+        if not self.torch_compile:
+            return model
+        mode = self.torch_compile if isinstance(self.torch_compile, str) else 'default'
+        logger.info(f"Compiling model with torch.compile, mode: {mode}")
+        model.compile(mode=mode, backend="inductor")
+        return model
+
+    @contextmanager
+    def inference_context(self):
+        """
+        Context of an inference forward pass. Runs under `torch.inference_mode`, and under autocast to
+        `autocast_dtype` with TF32 matmuls when it is set. Entered per batch, so it also applies in the
+        processes spawned for DDP; the global matmul precision is restored on exit.
+        """
+        if self.autocast_dtype is None:
+            with torch.inference_mode():
+                yield
+            return
+        matmul_precision = torch.get_float32_matmul_precision()
+        # allow TF32 for the matmuls left in fp32 by autocast.
+        torch.set_float32_matmul_precision('high')
+        try:
+            with torch.inference_mode(), torch.autocast(
+                device_type=self.device.type, dtype=self.autocast_dtype
+            ):
+                yield
+        finally:
+            torch.set_float32_matmul_precision(matmul_precision)
+
     def decorate_batch(self, batch, feature_name=None):
         """
         Prepares a batch of data for processing by the model. This method is a wrapper that
@@ -149,16 +196,16 @@ class Trainer(object):
         """
         net_input, net_target = batch
         if isinstance(net_input, dict):
-            net_input, net_target = {
-                k: v.to(self.device) for k, v in net_input.items()
-            }, net_target.to(self.device)
+            net_input = {
+                k: v.to(self.device, non_blocking=True) for k, v in net_input.items()
+            }
         else:
-            net_input, net_target = {
-                'net_input': net_input.to(self.device)
-            }, net_target.to(self.device)
+            net_input = {'net_input': net_input.to(self.device, non_blocking=True)}
         if self.task == 'repr':
-            net_target = None
-        elif self.task in ['classification', 'multiclass', 'multilabel_classification']:
+            # placeholder labels are not needed on device.
+            return net_input, None
+        net_target = net_target.to(self.device, non_blocking=True)
+        if self.task in ['classification', 'multiclass', 'multilabel_classification']:
             net_target = net_target.long()
         else:
             net_target = net_target.float()
@@ -249,6 +296,7 @@ class Trainer(object):
         :return: Predictions made by the model on the validation dataset.
         """
         model = model.to(self.device)
+        model = self.compile_model(model)
         train_dataloader = NNDataLoader(
             feature_name=feature_name,
             dataset=train_dataset,
@@ -257,6 +305,7 @@ class Trainer(object):
             collate_fn=model.batch_collate_fn,
             distributed=False,
             drop_last=True,
+            **self.dataloader_params,
         )
         optimizer, scheduler = self._initialize_optimizer_scheduler(
             model, train_dataloader
@@ -343,6 +392,8 @@ class Trainer(object):
         """
         self.init_ddp(local_rank)
         model = model.to(local_rank)
+        # compile before wrapping with DDP.
+        model = self.compile_model(model)
         model = DistributedDataParallel(
             model, device_ids=[local_rank], find_unused_parameters=True
         )
@@ -354,6 +405,7 @@ class Trainer(object):
             collate_fn=model.module.batch_collate_fn,
             distributed=True,
             drop_last=True,
+            **self.dataloader_params,
         )
         optimizer, scheduler = self._initialize_optimizer_scheduler(
             model, train_dataloader
@@ -569,6 +621,7 @@ class Trainer(object):
             collate_fn=batch_collate_fn,
             distributed=self.ddp,
             valid_mode=True,
+            **self.dataloader_params,
         )
         y_preds, val_loss, y_truths = self._perform_prediction(
             model, dataloader, loss_func, activation_fn, load_model, epoch, feature_name
@@ -746,6 +799,7 @@ class Trainer(object):
             shuffle=False,
             collate_fn=model.module.batch_collate_fn,
             distributed=True,
+            **self.dataloader_params,
         )
         model = model.eval()
         if return_atomic_reprs:
@@ -757,7 +811,7 @@ class Trainer(object):
             }
             for batch in tqdm(dataloader):
                 net_input, _ = self.decorate_batch(batch, feature_name)
-                with torch.no_grad():
+                with self.inference_context():
                     outputs = model(
                         **net_input,
                         return_repr=return_repr,
@@ -766,7 +820,7 @@ class Trainer(object):
 
                 assert isinstance(outputs, dict)
                 repr_dict["cls_repr"].extend(
-                    item.cpu().numpy() for item in outputs["cls_repr"]
+                    item.float().cpu().numpy() for item in outputs["cls_repr"]
                     )
                 if model_name == 'unimolv1':
                     repr_dict["atomic_symbol"].extend(
@@ -777,10 +831,10 @@ class Trainer(object):
                         item.cpu().numpy() for item in outputs["atomic_symbol"]
                         )
                 repr_dict['atomic_coords'].extend(
-                    item.cpu().numpy() for item in outputs['atomic_coords']
+                    item.float().cpu().numpy() for item in outputs['atomic_coords']
                     )
                 repr_dict['atomic_reprs'].extend(
-                    item.cpu().numpy() for item in outputs['atomic_reprs']
+                    item.float().cpu().numpy() for item in outputs['atomic_reprs']
                     )
 
             world_size = dist.get_world_size()
@@ -823,14 +877,14 @@ class Trainer(object):
                 repr_tensor = []
                 for batch in tqdm(dataloader):
                     net_input, _ = self.decorate_batch(batch, feature_name)
-                    with torch.no_grad():
+                    with self.inference_context():
                         outputs = model(
                             **net_input,
                             return_repr=return_repr,
                             return_atomic_reprs=return_atomic_reprs,
                         )
                     assert isinstance(outputs, torch.Tensor)
-                    repr_tensor.append(outputs.cpu().numpy())
+                    repr_tensor.append(outputs.float().cpu().numpy())
                 repr_tensor = np.concatenate(repr_tensor, axis=0)
                 
                 gathered_list = [None for _ in range(dist.get_world_size())]
@@ -849,14 +903,14 @@ class Trainer(object):
                 repr_list = []
                 for batch in tqdm(dataloader):
                     net_input, _ = self.decorate_batch(batch, feature_name)
-                    with torch.no_grad():
+                    with self.inference_context():
                         outputs = model(
                             **net_input,
                             return_repr=return_repr,
                             return_atomic_reprs=return_atomic_reprs,
                         )
                     assert isinstance(outputs, torch.Tensor)
-                    repr_list.extend(item.cpu().numpy() for item in outputs)
+                    repr_list.extend(item.float().cpu().numpy() for item in outputs)
 
                 world_size = dist.get_world_size()
                 gathered_list = [None for _ in range(world_size)]
@@ -914,6 +968,7 @@ class Trainer(object):
             shuffle=False,
             collate_fn=model.batch_collate_fn,
             distributed=False,
+            **self.dataloader_params,
         )
         model = model.eval()
         if return_atomic_reprs:
@@ -925,7 +980,7 @@ class Trainer(object):
             }
             for batch in tqdm(dataloader):
                 net_input, _ = self.decorate_batch(batch, feature_name)
-                with torch.no_grad():
+                with self.inference_context():
                     outputs = model(
                         **net_input,
                         return_repr=return_repr,
@@ -933,7 +988,7 @@ class Trainer(object):
                     )
                 assert isinstance(outputs, dict)
                 repr_dict["cls_repr"].extend(
-                    item.cpu().numpy() for item in outputs["cls_repr"]
+                    item.float().cpu().numpy() for item in outputs["cls_repr"]
                 )
                 if model_name == 'unimolv1':
                     repr_dict["atomic_symbol"].extend(outputs["atomic_symbol"])
@@ -942,10 +997,10 @@ class Trainer(object):
                         item.cpu().numpy() for item in outputs["atomic_symbol"]
                     )
                 repr_dict["atomic_coords"].extend(
-                    item.cpu().numpy() for item in outputs['atomic_coords']
+                    item.float().cpu().numpy() for item in outputs['atomic_coords']
                 )
                 repr_dict["atomic_reprs"].extend(
-                    item.cpu().numpy() for item in outputs['atomic_reprs']
+                    item.float().cpu().numpy() for item in outputs['atomic_reprs']
                 )
             return repr_dict
         else:
@@ -953,14 +1008,14 @@ class Trainer(object):
                 repr_tensor = []
                 for batch in tqdm(dataloader):
                     net_input, _ = self.decorate_batch(batch, feature_name)
-                    with torch.no_grad():
+                    with self.inference_context():
                         outputs = model(
                             **net_input,
                             return_repr=return_repr,
                             return_atomic_reprs=return_atomic_reprs,
                         )
                     assert isinstance(outputs, torch.Tensor)
-                    repr_tensor.append(outputs.cpu().numpy())
+                    repr_tensor.append(outputs.float().cpu().numpy())
                 repr_tensor = np.concatenate(repr_tensor, axis=0)
                 repr_tensor = torch.from_numpy(repr_tensor)
                 return repr_tensor
@@ -968,7 +1023,7 @@ class Trainer(object):
                 repr_list = []
                 for batch in tqdm(dataloader):
                     net_input, _ = self.decorate_batch(batch, feature_name)
-                    with torch.no_grad():
+                    with self.inference_context():
                         outputs = model(
                             **net_input,
                             return_repr=return_repr,
@@ -976,10 +1031,22 @@ class Trainer(object):
                         )
                     assert isinstance(outputs, torch.Tensor)
                     repr_list.extend(
-                        item.cpu().numpy() for item in outputs
+                        item.float().cpu().numpy() for item in outputs
                     )
                 return repr_list
 
+    @property
+    def dataloader_params(self):
+        """
+        Worker and memory settings shared by all the dataloaders built by the trainer.
+        """
+        return {
+            'num_workers': self.num_workers,
+            'prefetch_factor': self.prefetch_factor,
+            'persistent_workers': self.persistent_workers,
+            'pin_memory': self.pin_memory,
+        }
+
     def set_seed(self, seed):
         """
         Sets a random seed for torch and numpy to ensure reproducibility.
@@ -1080,6 +1147,10 @@ def NNDataLoader(
     drop_last=False,
     distributed=False,
     valid_mode=False,
+    num_workers=0,
+    prefetch_factor=None,
+    persistent_workers=False,
+    pin_memory=True,
 ):
     """
     Creates a DataLoader for neural network training or inference. This
@@ -1094,6 +1165,11 @@ def NNDataLoader(
     :param collate_fn: (callable, optional) Merges a list of samples to form a mini-batch. Defaults to None.
     :param drop_last: (bool, optional) Set to True to drop the last incomplete batch. Defaults to False.
     :param distributed: (bool, optional) Set to True to enable distributed data loading. Defaults to False.
+    :param valid_mode: (bool, optional) Set to True to disable the DDP generator for validation. Defaults to False.
+    :param num_workers: (int, optional) Number of subprocesses used to prepare batches. Defaults to 0.
+    :param prefetch_factor: (int, optional) Number of batches loaded in advance by each worker. Only works when num_workers > 0. Defaults to None.
+    :param persistent_workers: (bool, optional) Keep the workers alive between iterations. Only works when num_workers > 0. Defaults to False.
+    :param pin_memory: (bool, optional) Copy tensors into pinned memory so host to device transfers can be asynchronous. Defaults to True.
 
     :return: DataLoader configured according to the provided parameters.
     """
@@ -1108,16 +1184,26 @@ def NNDataLoader(
     if valid_mode:
         g = None
 
+    if num_workers > 0:
+        worker_params = {
+            'prefetch_factor': prefetch_factor,
+            'persistent_workers': persistent_workers,
+        }
+    else:
+        # prefetch_factor and persistent_workers are only valid with worker processes.
+        worker_params = {}
+
     dataloader = TorchDataLoader(
         dataset=dataset,
         batch_size=batch_size,
         shuffle=shuffle,
         collate_fn=collate_fn,
         drop_last=drop_last,
-        # num_workers=4,
-        pin_memory=True,
+        num_workers=num_workers,
+        pin_memory=pin_memory and torch.cuda.is_available(),
         sampler=sampler,
         generator=g,
+        **worker_params,
     )
     return dataloader
 
@@ -6,6 +6,7 @@ from __future__ import absolute_import, division, print_function
 
 import argparse
 import copy
+import functools
 import json
 import logging
 import os
@@ -20,6 +21,19 @@ from .tasks import Trainer
 from .utils import YamlHandler, logger
 
 
+@functools.lru_cache(maxsize=32)
+def _load_yaml(config_path, mtime):
+    """
+    Reads and caches a yaml config. `mtime` is part of the cache key, so an edited file is read again.
+
+    :param config_path: str, path of the yaml config file.
+    :param mtime: float, modification time of the config file.
+
+    :return: Dict (addict), the parsed config. Callers must copy it before mutation.
+    """
+    return YamlHandler(config_path).read_yaml()
+
+
 class MolTrain(object):
     """A :class:`MolTrain` class is responsible for interface of training process of molecular data."""
 
@@ -54,6 +68,11 @@ class MolTrain(object):
         model_name='unimolv1',
         model_size='84m',
         conf_cache_level=1,
+        torch_compile=False,
+        num_workers=0,
+        prefetch_factor=4,
+        persistent_workers=True,
+        pin_memory=True,
         **params,
     ):
         """
@@ -120,6 +139,12 @@ class MolTrain(object):
             - 0: no caching.
             - 1: cache if not exists.
             - 2: always cache.
+        :param torch_compile: bool or str, default=False, whether to compile the model with `torch.compile` before training. \
+            True means the default mode, a str selects the mode. currently support: default, reduce-overhead, max-autotune.
+        :param num_workers: int, default=0, number of dataloader workers to prepare batches in parallel. 0 means loading in the main process.
+        :param prefetch_factor: int, default=4, number of batches loaded in advance by each worker. Only works when num_workers > 0.
+        :param persistent_workers: bool, default=True, whether to keep dataloader workers alive across epochs. Only works when num_workers > 0.
+        :param pin_memory: bool, default=True, whether to use pinned memory so host to device transfers overlap with compute.
 
         """
         if load_model_dir is not None:
@@ -128,37 +153,44 @@ class MolTrain(object):
         else:
             config_path = os.path.join(os.path.dirname(__file__), 'config/default.yaml')
         self.yamlhandler = YamlHandler(config_path)
-        config = self.yamlhandler.read_yaml()
-        config.task = task
-        config.data_type = data_type
-        config.epochs = epochs
-        config.learning_rate = learning_rate
-        config.batch_size = batch_size
-        config.patience = early_stopping
-        config.metrics = metrics
-        config.split = split
-        config.split_group_col = split_group_col
-        config.kfold = kfold
-        config.remove_hs = remove_hs
-        config.smiles_col = smiles_col
-        config.target_cols = target_cols
-        config.target_col_prefix = target_col_prefix
-        config.anomaly_clean = target_anomaly_check or target_anomaly_check in [
-            'filter'
-        ]
-        config.smi_strict = smiles_check in ['filter']
-        config.target_normalize = target_normalize
-        config.max_norm = max_norm
-        config.use_cuda = use_cuda
-        config.use_amp = use_amp
-        config.use_ddp = use_ddp
-        config.use_gpu = use_gpu
-        config.freeze_layers = freeze_layers
-        config.freeze_layers_reversed = freeze_layers_reversed
-        config.load_model_dir = load_model_dir
-        config.model_name = model_name
-        config.model_size = model_size
-        config.conf_cache_level = conf_cache_level
+        config = copy.deepcopy(_load_yaml(config_path, os.path.getmtime(config_path)))
+        overrides = dict(
+            task=task,
+            data_type=data_type,
+            epochs=epochs,
+            learning_rate=learning_rate,
+            batch_size=batch_size,
+            patience=early_stopping,
+            metrics=metrics,
+            split=split,
+            split_group_col=split_group_col,
+            kfold=kfold,
+            remove_hs=remove_hs,
+            smiles_col=smiles_col,
+            target_cols=target_cols,
+            target_col_prefix=target_col_prefix,
+            anomaly_clean=target_anomaly_check or target_anomaly_check in ['filter'],
+            smi_strict=smiles_check in ['filter'],
+            target_normalize=target_normalize,
+            max_norm=max_norm,
+            use_cuda=use_cuda,
+            use_amp=use_amp,
+            use_ddp=use_ddp,
+            use_gpu=use_gpu,
+            freeze_layers=freeze_layers,
+            freeze_layers_reversed=freeze_layers_reversed,
+            load_model_dir=load_model_dir,
+            model_name=model_name,
+            model_size=model_size,
+            conf_cache_level=conf_cache_level,
+            torch_compile=torch_compile,
+            num_workers=num_workers,
+            prefetch_factor=prefetch_factor,
+            persistent_workers=persistent_workers,
+            pin_memory=pin_memory,
+        )
+        # apply user overrides in a single pass over the yaml config
+        config.update(overrides)
         self.save_path = save_path
         self.config = config
 
@@ -1,4 +1,3 @@
-import copy
 import os
 
 import numpy as np
@@ -296,10 +295,10 @@ class Metrics(object):
     def calculate_single_classification_threshold(
         self, target, pred, metrics_key=None, step=20
     ):
-        data = copy.deepcopy(pred)
-        range_min = np.min(data).item()
-        range_max = np.max(data).item()
+        range_min = np.min(pred).item()
+        range_max = np.max(pred).item()
 
+        metric = None
         for metric_type, metric_value in self.metric_dict.items():
             metric, is_increase, value_type = metric_value
             if value_type == 'int':
@@ -309,34 +308,27 @@ class Metrics(object):
         if metrics_key is None:
             metrics_key = METRICS_REGISTER['classification']['f1_score']
         logger.info("metrics for threshold: {0}".format(metrics_key[0].__name__))
-        metrics = metrics_key[0]
-        if metrics_key[1]:
-            # increase metric
-            best_metric = float('-inf')
+        # thresholds are scored with the last metric visited above, which is the threshold
+        # metric only when an 'int' metric is configured; otherwise it is the last configured metric.
+        metrics = metric if metric is not None else metrics_key[0]
+        thresholds = np.linspace(range_min, range_max, step)
+        # binarize the predictions for all candidate thresholds in one pass
+        pred_labels = (pred.reshape(-1, 1) > thresholds.reshape(1, -1)).astype(pred.dtype)
+        scores = np.array(
+            [metrics(target, pred_labels[:, i : i + 1]) for i in range(step)],
+            dtype=np.float64,
+        )
+        if np.isnan(scores).all():
             best_threshold = 0.5
-            for threshold in np.linspace(range_min, range_max, step):
-                pred_label = np.zeros_like(pred)
-                pred_label[pred > threshold] = 1
-                # print ("threshold: ", threshold, metric(target, pred_label))
-                if metric(target, pred_label) > best_metric:
-                    best_metric = metric(target, pred_label)
-                    best_threshold = threshold
-            logger.info(
-                "best threshold: {0}, metrics: {1}".format(best_threshold, best_metric)
-            )
+            best_metric = float('-inf') if metrics_key[1] else float('inf')
         else:
-            # increase metric
-            best_metric = float('inf')
-            best_threshold = 0.5
-            for threshold in np.linspace(range_min, range_max, step):
-                pred_label = np.zeros_like(pred)
-                pred_label[pred > threshold] = 1
-                if metric(target, pred_label) < best_metric:
-                    best_metric = metric(target, pred_label)
-                    best_threshold = threshold
-            logger.info(
-                "best threshold: {0}, metrics: {1}".format(best_threshold, best_metric)
-            )
+            # increase metric takes the first maximum, decrease metric the first minimum
+            best_idx = np.nanargmax(scores) if metrics_key[1] else np.nanargmin(scores)
+            best_threshold = thresholds[best_idx]
+            best_metric = scores[best_idx]
+        logger.info(
+            "best threshold: {0}, metrics: {1}".format(best_threshold, best_metric)
+        )
 
         return best_threshold
 